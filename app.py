@@ -1,11 +1,27 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, url_for, g, has_app_context
 import os
+import atexit
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import tempfile
 import base64
+import concurrent.futures
+import copy
+import functools
+import glob
+import hashlib
+import itertools
+import re
+import shutil
+import subprocess
+import threading
+import time
 from io import BytesIO
 import uuid
+from tesseract_path import find_tesseract
+from mp4_probe import is_faststart, probe_mp4_info
 
 # Import heavy dependencies with error handling
 try:
@@ -37,6 +53,13 @@ except ImportError as e:
     print(f"SpeechRecognition not available: {e}")
     SPEECH_RECOGNITION_AVAILABLE = False
 
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError as e:
+    print(f"faster-whisper not available: {e}")
+    FASTER_WHISPER_AVAILABLE = False
+
 try:
     from gtts import gTTS
     GTTS_AVAILABLE = True
@@ -51,28 +74,243 @@ except ImportError as e:
     print(f"pytesseract not available: {e}")
     PYTESSERACT_AVAILABLE = False
 
+FFMPEG_AVAILABLE = shutil.which('ffmpeg') is not None
+if not FFMPEG_AVAILABLE:
+    print("ffmpeg not available on PATH")
+
 app = Flask(__name__)
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
 DATA_FILE = 'video_data.json'
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'vidcache')
+CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2GB of cached videos
+VIDEO_MAX_BYTES = 200 * 1024 * 1024  # Downloads past this are aborted
+HTTP_TIMEOUT = (5, 30)  # (connect, read) seconds, so a stalled server cannot hold a worker
+# The artifact routes are fixed URLs whose content follows current_video_url,
+# so browsers must revalidate every time (cheap: a 304 when the ETag still matches)
+ARTIFACT_MAX_AGE = 0
+# Set to the nginx internal location serving CACHE_DIR (e.g. /internal/) to offload file transfers
+X_ACCEL_REDIRECT_PREFIX = os.environ.get('X_ACCEL_REDIRECT_PREFIX', '')
+TRANSLATE_MAX_CHARS = 1000  # Longer texts are translated sentence by sentence
+
+# Per-process scratch area; each request gets its own subdirectory, removed when it ends
+SCRATCH_DIR = tempfile.mkdtemp(prefix='vidproc_')
+atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+
+# Shared HTTP session so downloads reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# In-memory copy of DATA_FILE and the file mtime it was read at
+_DATA_CACHE = None
+_DATA_MTIME = None
+_DATA_LOCK = threading.RLock()
 
 def load_data():
-    """Load persistent data from file"""
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    return {"current_video_url": "", "video_info": {}}
+    """Load persistent data, re-reading the file only when another worker has changed it"""
+    global _DATA_CACHE, _DATA_MTIME
+    with _DATA_LOCK:
+        mtime = os.path.getmtime(DATA_FILE) if os.path.exists(DATA_FILE) else None
+        if _DATA_CACHE is None or mtime != _DATA_MTIME:
+            if mtime is not None:
+                with open(DATA_FILE, 'r') as f:
+                    _DATA_CACHE = json.load(f)
+            else:
+                _DATA_CACHE = {"current_video_url": "", "video_info": {}}
+            _DATA_MTIME = mtime
+        return copy.deepcopy(_DATA_CACHE)
 
 def save_data(data):
-    """Save data to file"""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f)
+    """Save data to memory and atomically replace the file"""
+    global _DATA_CACHE, _DATA_MTIME
+    with _DATA_LOCK:
+        _DATA_CACHE = copy.deepcopy(data)
+        # Per-process temp name so concurrent workers never write the same file
+        temp_path = f"{DATA_FILE}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, DATA_FILE)
+        _DATA_MTIME = os.path.getmtime(DATA_FILE)
+
+_YT_RE = re.compile(r'(?:^|//)(?:www\.|m\.)?(?:youtube\.com|youtu\.be)(?:[/?#:]|$)', re.IGNORECASE)
+
+def scratch_path(name):
+    """Path for a temp file in the current request's scratch directory"""
+    if not has_app_context():
+        return os.path.join(SCRATCH_DIR, f"{uuid.uuid4().hex}_{name}")
+    if 'scratch_dir' not in g:
+        g.scratch_dir = os.path.join(SCRATCH_DIR, uuid.uuid4().hex)
+        os.makedirs(g.scratch_dir)
+    return os.path.join(g.scratch_dir, name)
+
+@app.teardown_appcontext
+def remove_scratch_dir(exception=None):
+    """Remove the request's scratch directory and anything left in it"""
+    scratch_dir = g.pop('scratch_dir', None)
+    if scratch_dir:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
 
 def is_youtube_url(url):
     """Check if URL is a YouTube URL"""
-    youtube_domains = ['youtube.com', 'youtu.be', 'www.youtube.com', 'm.youtube.com']
-    return any(domain in url.lower() for domain in youtube_domains)
+    return _YT_RE.search(url) is not None
+
+def touch_cache_file(path):
+    """Mark a cached file as recently used without changing its mtime (the ETag/Last-Modified source)"""
+    os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+
+def evict_video_cache(keep=None):
+    """Remove least recently used videos until the cache fits in CACHE_MAX_BYTES"""
+    try:
+        entries = []
+        for name in os.listdir(CACHE_DIR):
+            path = os.path.join(CACHE_DIR, name)
+            if name.endswith('.part') or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            # touch_cache_file records use in atime; mtime stays the creation time
+            entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= CACHE_MAX_BYTES:
+                break
+            if path == keep:
+                continue
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+    except Exception as e:
+        print(f"Error evicting video cache: {e}")
+
+def video_cache_path(url):
+    """Path of the cached local copy of a video URL"""
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.mp4')
+
+def iter_video_content(response, chunk_size):
+    """Yield the response body, rejecting it unless it starts with an MP4 ftyp box"""
+    head = b''
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if head is not None:
+            # Bytes 4-8 of an ISO/IEC 14496-12 file are the ftyp box type
+            head += chunk
+            if len(head) < 8:
+                continue
+            if head[4:8] != b'ftyp':
+                break
+            chunk, head = head, None
+        yield chunk
+    
+    if head:
+        content_type = response.headers.get('content-type', '')
+        response.close()
+        raise ValueError(f"URL does not appear to be an MP4 video file. Content type: {content_type}")
+
+def get_local_video(url):
+    """Download video once and return the path of the cached local copy"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    local_path = video_cache_path(url)
+    
+    if os.path.exists(local_path) and os.path.getsize(local_path) > 0:
+        # Touch the file so LRU eviction keeps recently used videos
+        touch_cache_file(local_path)
+        return local_path
+    
+    # Download video with timeout
+    response = SESSION.get(url, stream=True, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    
+    # Download into a partial file and move it into place atomically
+    fd, partial_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            total = 0
+            for chunk in iter_video_content(response, 1 << 20):
+                total += len(chunk)
+                if total > VIDEO_MAX_BYTES:
+                    response.close()
+                    raise IOError(f"Video is larger than {VIDEO_MAX_BYTES // (1024 * 1024)}MB")
+                if chunk:
+                    f.write(chunk)
+        
+        # Verify file was downloaded completely
+        if os.path.getsize(partial_path) == 0:
+            raise ValueError("Video file is empty")
+        
+        os.replace(partial_path, local_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.unlink(partial_path)
+    
+    evict_video_cache(keep=local_path)
+    return local_path
+
+def get_artifact(key, suffix, build):
+    """Return the cached file derived from key, building it with build() on first use"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, hashlib.sha1(key.encode('utf-8')).hexdigest() + suffix)
+    
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        # Touch the file so LRU eviction keeps recently used artifacts
+        touch_cache_file(path)
+        return path
+    
+    built_file = build()
+    if not built_file:
+        return None
+    shutil.move(built_file, path)
+    evict_video_cache(keep=path)
+    return path
+
+def send_artifact(path, mimetype, as_attachment=False, download_name=None):
+    """Send a cached artifact with validators for conditional requests, or hand it off to nginx"""
+    if X_ACCEL_REDIRECT_PREFIX:
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = X_ACCEL_REDIRECT_PREFIX + os.path.basename(path)
+        response.headers['Cache-Control'] = 'no-cache'
+        if as_attachment:
+            response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        return response
+    return send_file(path, mimetype=mimetype, as_attachment=as_attachment, download_name=download_name,
+                     conditional=True, etag=True, last_modified=os.path.getmtime(path),
+                     max_age=ARTIFACT_MAX_AGE)
+
+def fetch_byte_range(url, start, length):
+    """Fetch up to length bytes of a video starting at start, or None if Range is not honoured"""
+    response = SESSION.get(url, headers={'Range': f'bytes={start}-{start + length - 1}'},
+                           stream=True, timeout=HTTP_TIMEOUT)
+    try:
+        response.raise_for_status()
+        
+        # A 200 means the server ignored the Range header and sent the whole file
+        if response.status_code != 206 and start > 0:
+            return None
+        
+        # Only the start of the file carries the ftyp signature
+        if start == 0:
+            chunks = iter_video_content(response, 64 * 1024)
+        else:
+            chunks = response.iter_content(chunk_size=64 * 1024)
+        
+        data = bytearray()
+        for chunk in chunks:
+            data.extend(chunk)
+            if len(data) >= length:
+                break
+        return bytes(data[:length])
+    finally:
+        response.close()
 
 def get_video_info(url):
     """Get video duration and height"""
@@ -81,49 +319,22 @@ def get_video_info(url):
         if is_youtube_url(url):
             return {"duration": 0, "height": 0, "error": "YouTube URLs are not supported. Please use direct MP4 video URLs or upload your video to a file sharing service."}
         
+        # Read metadata from a few KB of the moov box unless the whole video is already cached
+        if not (CV2_AVAILABLE and os.path.exists(video_cache_path(url))):
+            video_info = probe_mp4_info(lambda start, length: fetch_byte_range(url, start, length))
+            if video_info:
+                return video_info
+        
         if not CV2_AVAILABLE:
             return {"duration": 0, "height": 0, "error": "Video processing not available - OpenCV not installed"}
         
-        # Download video with proper headers and timeout
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, stream=True, headers=headers, timeout=30)
-        
-        # Handle specific HTTP errors
-        if response.status_code == 402:
-            return {"duration": 0, "height": 0, "error": "Video URL requires payment or has expired"}
-        elif response.status_code == 403:
-            return {"duration": 0, "height": 0, "error": "Video URL access forbidden"}
-        elif response.status_code == 404:
-            return {"duration": 0, "height": 0, "error": "Video URL not found"}
-        
-        response.raise_for_status()
-        
-        # Check content type
-        content_type = response.headers.get('content-type', '').lower()
-        if 'video' not in content_type and 'mp4' not in content_type:
-            return {"duration": 0, "height": 0, "error": f"URL does not appear to be a video file. Content type: {content_type}"}
-        
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-        
-        # Download in chunks
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                temp_file.write(chunk)
-        temp_file.close()
-        
-        # Verify file was downloaded completely
-        if os.path.getsize(temp_file.name) == 0:
-            os.unlink(temp_file.name)
-            return {"duration": 0, "height": 0, "error": "Video file is empty"}
+        local_video = get_local_video(url)
         
         # Get video info using OpenCV
-        cap = cv2.VideoCapture(temp_file.name)
+        cap = cv2.VideoCapture(local_video)
         
         if not cap.isOpened():
             cap.release()
-            os.unlink(temp_file.name)
             return {"duration": 0, "height": 0, "error": "Could not open video file - may not be a valid MP4"}
         
         fps = cap.get(cv2.CAP_PROP_FPS)
@@ -132,56 +343,97 @@ def get_video_info(url):
         duration = frame_count / fps if fps > 0 else 0
         
         cap.release()
-        os.unlink(temp_file.name)
         
         return {"duration": duration, "height": height}
+    except requests.exceptions.HTTPError as e:
+        # Handle specific HTTP errors
+        status_code = e.response.status_code if e.response is not None else None
+        if status_code == 402:
+            return {"duration": 0, "height": 0, "error": "Video URL requires payment or has expired"}
+        elif status_code == 403:
+            return {"duration": 0, "height": 0, "error": "Video URL access forbidden"}
+        elif status_code == 404:
+            return {"duration": 0, "height": 0, "error": "Video URL not found"}
+        print(f"Network error getting video info: {e}")
+        return {"duration": 0, "height": 0, "error": f"Network error: {str(e)}"}
     except requests.exceptions.RequestException as e:
         print(f"Network error getting video info: {e}")
         return {"duration": 0, "height": 0, "error": f"Network error: {str(e)}"}
+    except ValueError as e:
+        return {"duration": 0, "height": 0, "error": str(e)}
     except Exception as e:
         print(f"Error getting video info: {e}")
         return {"duration": 0, "height": 0, "error": f"Processing error: {str(e)}"}
 
+def get_cached_video_info(url):
+    """Return the stored video info for the current URL, computing it if needed"""
+    data = load_data()
+    if data.get('current_video_url') == url and data.get('video_info', {}).get('duration'):
+        return data['video_info']
+    return get_video_info(url)
+
 def extract_audio_segment(url, start_time=30, end_time=45):
     """Extract audio segment from video"""
     try:
-        if not MOVIEPY_AVAILABLE:
-            return None
+        if not FFMPEG_AVAILABLE:
+            return extract_audio_segment_moviepy(url, start_time, end_time)
+        
+        local_video = get_local_video(url)
+        
+        # Ensure we don't exceed video duration
+        video_duration = get_cached_video_info(url).get('duration', 0)
+        if video_duration > 0:
+            if start_time >= video_duration:
+                return None
             
-        # Download video with proper headers and timeout
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, stream=True, headers=headers, timeout=30)
-        response.raise_for_status()
+            # Adjust end_time to not exceed video duration
+            end_time = min(end_time, video_duration)
         
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+        # Ensure we have at least some audio to extract
+        if end_time <= start_time:
+            return None
         
-        # Download in chunks
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                temp_file.write(chunk)
-        temp_file.close()
+        print(f"Extracting audio from {start_time}s to {end_time}s (duration: {end_time - start_time}s)")
+        audio_file = scratch_path('audio.wav')
         
-        # Verify file was downloaded completely
-        if os.path.getsize(temp_file.name) == 0:
-            os.unlink(temp_file.name)
+        # Seek before the input and skip the video stream so nothing gets decoded but audio
+        try:
+            subprocess.run(
+                ["ffmpeg", "-y", "-ss", str(start_time), "-to", str(end_time), "-i", local_video,
+                 "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1", audio_file],
+                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except subprocess.CalledProcessError:
+            # Also raised when the video has no audio stream, in which case ffmpeg may not create the file
+            if os.path.exists(audio_file):
+                os.unlink(audio_file)
             return None
         
+        return audio_file
+    except Exception as e:
+        print(f"Error extracting audio: {e}")
+        return None
+
+def extract_audio_segment_moviepy(url, start_time=30, end_time=45):
+    """Extract audio segment from video with MoviePy (used when ffmpeg is not on PATH)"""
+    try:
+        if not MOVIEPY_AVAILABLE:
+            return None
+            
+        local_video = get_local_video(url)
+        
         # Extract audio segment
-        video = VideoFileClip(temp_file.name)
+        video = VideoFileClip(local_video)
         
         # Check if video has audio
         if video.audio is None:
             video.close()
-            os.unlink(temp_file.name)
             return None
         
         # Ensure we don't exceed video duration
         video_duration = video.duration
         if start_time >= video_duration:
             video.close()
-            os.unlink(temp_file.name)
             return None
         
         # Adjust end_time to not exceed video duration
@@ -190,161 +442,155 @@ def extract_audio_segment(url, start_time=30, end_time=45):
         # Ensure we have at least some audio to extract
         if end_time <= start_time:
             video.close()
-            os.unlink(temp_file.name)
             return None
         
         print(f"Extracting audio from {start_time}s to {end_time}s (duration: {end_time - start_time}s)")
         audio_segment = video.subclip(start_time, end_time)
         
         # Save audio segment as WAV for speech recognition
-        audio_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-        audio_segment.audio.write_audiofile(audio_file.name, verbose=False, logger=None, codec='pcm_s16le')
+        audio_file = scratch_path('audio.wav')
+        audio_segment.audio.write_audiofile(audio_file, verbose=False, logger=None, codec='pcm_s16le')
         
         video.close()
         audio_segment.close()
-        os.unlink(temp_file.name)
         
-        return audio_file.name
+        return audio_file
     except Exception as e:
         print(f"Error extracting audio: {e}")
         return None
 
+# On-device Whisper model, loaded on first use
+_WHISPER_MODEL = None
+_WHISPER_LOCK = threading.Lock()
+
+def get_whisper_model():
+    """Return the shared int8 Whisper model, loading it on first use"""
+    global _WHISPER_MODEL
+    with _WHISPER_LOCK:
+        if _WHISPER_MODEL is None:
+            _WHISPER_MODEL = WhisperModel("base.en", device="cpu", compute_type="int8")
+        return _WHISPER_MODEL
+
+def transcribe_local(audio_file):
+    """Transcribe a WAV file on-device with faster-whisper"""
+    segments, _info = get_whisper_model().transcribe(audio_file, beam_size=1, vad_filter=True)
+    return "".join(segment.text for segment in segments).strip()
+
+def recognize_audio(audio_file):
+    """Transcribe a WAV file on-device when possible, falling back to Google"""
+    if FASTER_WHISPER_AVAILABLE:
+        try:
+            return transcribe_local(audio_file)
+        except Exception as e:
+            if not SPEECH_RECOGNITION_AVAILABLE:
+                raise
+            print(f"Local transcription failed, falling back to Google: {e}")
+    return recognize_google_audio(audio_file)
+
+def recognize_google_audio(audio_file):
+    """Transcribe a WAV file with a single Google recognition request"""
+    r = sr.Recognizer()
+    
+    with sr.AudioFile(audio_file) as source:
+        r.adjust_for_ambient_noise(source, duration=0.3)
+        audio = r.record(source)
+    try:
+        return r.recognize_google(audio, language='en-US')
+    except sr.UnknownValueError:
+        # Noise adjustment can swallow quiet speech at the start, retry without it
+        print("Transcription with noise adjustment failed, retrying without it")
+    
+    with sr.AudioFile(audio_file) as source:
+        audio = r.record(source)
+    return r.recognize_google(audio, language='en-US')
+
 def transcribe_audio(audio_file):
-    """Transcribe audio to text using speech recognition with multiple approaches"""
+    """Transcribe audio to text using speech recognition"""
     try:
-        if not SPEECH_RECOGNITION_AVAILABLE:
+        if not SPEECH_RECOGNITION_AVAILABLE and not FASTER_WHISPER_AVAILABLE:
             return "Speech recognition not available"
             
         # Check if audio file exists and has content
         if not os.path.exists(audio_file) or os.path.getsize(audio_file) == 0:
             return "No audio content found"
         
-        r = sr.Recognizer()
-        all_text = []
-        
-        # Method 1: Try with minimal noise adjustment (captures beginning better)
-        try:
-            with sr.AudioFile(audio_file) as source:
-                r.adjust_for_ambient_noise(source, duration=0.1)
-                audio = r.record(source)
-                text = r.recognize_google(audio, language='en-US')
-                if text.strip():
-                    all_text.append(text)
-                    print(f"Minimal noise (0.1s): {text}")
-        except Exception as e:
-            print(f"Minimal noise transcription failed: {e}")
-        
-        # Method 2: Try without any noise adjustment
-        try:
-            with sr.AudioFile(audio_file) as source:
-                audio = r.record(source)
-                text = r.recognize_google(audio, language='en-US')
-                if text.strip() and text not in all_text:
-                    all_text.append(text)
-                    print(f"No noise adjustment: {text}")
-        except Exception as e:
-            print(f"No noise transcription failed: {e}")
-        
-        # Method 3: Try with very short noise adjustment
-        try:
-            with sr.AudioFile(audio_file) as source:
-                r.adjust_for_ambient_noise(source, duration=0.2)
-                audio = r.record(source)
-                text = r.recognize_google(audio, language='en-US')
-                if text.strip() and text not in all_text:
-                    all_text.append(text)
-                    print(f"Short noise (0.2s): {text}")
-        except Exception as e:
-            print(f"Short noise transcription failed: {e}")
-        
-        # Method 4: Try with different language models
-        for language in ['en-US', 'en-GB']:
-            try:
-                with sr.AudioFile(audio_file) as source:
-                    r.adjust_for_ambient_noise(source, duration=0.1)
-                    audio = r.record(source)
-                    text = r.recognize_google(audio, language=language)
-                    if text.strip() and text not in all_text:
-                        all_text.append(text)
-                        print(f"Language {language}: {text}")
-            except Exception as e:
-                print(f"Language {language} transcription failed: {e}")
-        
-        # Method 5: Try with different energy threshold
-        try:
-            with sr.AudioFile(audio_file) as source:
-                r.adjust_for_ambient_noise(source, duration=0.1)
-                r.energy_threshold = 300  # Lower threshold for quieter speech
-                audio = r.record(source)
-                text = r.recognize_google(audio, language='en-US')
-                if text.strip() and text not in all_text:
-                    all_text.append(text)
-                    print(f"Lower energy threshold: {text}")
-        except Exception as e:
-            print(f"Lower energy threshold failed: {e}")
-        
-        # Method 6: Try with higher energy threshold
-        try:
-            with sr.AudioFile(audio_file) as source:
-                r.adjust_for_ambient_noise(source, duration=0.1)
-                r.energy_threshold = 4000  # Higher threshold for louder speech
-                audio = r.record(source)
-                text = r.recognize_google(audio, language='en-US')
-                if text.strip() and text not in all_text:
-                    all_text.append(text)
-                    print(f"Higher energy threshold: {text}")
-        except Exception as e:
-            print(f"Higher energy threshold failed: {e}")
-        
-        # Method 7: Try with dynamic energy threshold
-        try:
-            with sr.AudioFile(audio_file) as source:
-                r.adjust_for_ambient_noise(source, duration=0.1)
-                r.dynamic_energy_threshold = True
-                audio = r.record(source)
-                text = r.recognize_google(audio, language='en-US')
-                if text.strip() and text not in all_text:
-                    all_text.append(text)
-                    print(f"Dynamic energy threshold: {text}")
-        except Exception as e:
-            print(f"Dynamic energy threshold failed: {e}")
-        
-        # Return the best result
-        if all_text:
-            # Return the longest transcription (most likely to be complete)
-            best_text = max(all_text, key=len)
-            print(f"Selected best transcription: {best_text}")
-            return best_text
-        else:
-            return "No speech detected in the audio"
+        text = recognize_audio(audio_file)
+        return text if text.strip() else "No speech detected in the audio"
             
-    except sr.UnknownValueError:
-        return "Could not understand the audio - audio may be too quiet or unclear"
-    except sr.RequestError as e:
-        return f"Speech recognition service error: {e}"
     except Exception as e:
+        if SPEECH_RECOGNITION_AVAILABLE and isinstance(e, sr.UnknownValueError):
+            return "Could not understand the audio - audio may be too quiet or unclear"
+        if SPEECH_RECOGNITION_AVAILABLE and isinstance(e, sr.RequestError):
+            return f"Speech recognition service error: {e}"
         print(f"Error transcribing audio: {e}")
         return "Could not transcribe audio"
 
+class AudioExtractionError(Exception):
+    """Raised when no audio segment could be extracted from a video"""
+
+@functools.lru_cache(maxsize=256)
+def _transcribe_segment_cached(url, start_time, end_time):
+    """Transcribe a cached audio segment; failures raise so they are never cached"""
+    audio_file = get_audio_artifact(url, start_time, end_time)
+    if not audio_file:
+        raise AudioExtractionError("Could not extract audio")
+    
+    if not (SPEECH_RECOGNITION_AVAILABLE or FASTER_WHISPER_AVAILABLE) or os.path.getsize(audio_file) == 0:
+        return transcribe_audio(audio_file)
+    try:
+        text = recognize_audio(audio_file)
+    except Exception as e:
+        if SPEECH_RECOGNITION_AVAILABLE and isinstance(e, sr.UnknownValueError):
+            # The audio itself is unintelligible, so this result is stable
+            return "Could not understand the audio - audio may be too quiet or unclear"
+        raise
+    return text if text.strip() else "No speech detected in the audio"
+
+def transcribe_segment(url, start_time=30, end_time=45):
+    """Transcribe an audio segment of a video, or return None if no audio could be extracted"""
+    try:
+        return _transcribe_segment_cached(url, start_time, end_time)
+    except AudioExtractionError:
+        return None
+    except Exception as e:
+        if SPEECH_RECOGNITION_AVAILABLE and isinstance(e, sr.RequestError):
+            return f"Speech recognition service error: {e}"
+        print(f"Error transcribing audio: {e}")
+        return "Could not transcribe audio"
+
+@functools.lru_cache(maxsize=1024)
+def _translate_cached(text, target_language):
+    """Translate text using Google Translate (free API); failures raise so they are never cached"""
+    # Simple translation using Google Translate API (free tier)
+    url = "https://translate.googleapis.com/translate_a/single"
+    params = {
+        'client': 'gtx',
+        'sl': 'en',
+        'tl': target_language,
+        'dt': 't',
+        'q': text
+    }
+    
+    response = SESSION.get(url, params=params, timeout=5, headers={'Accept-Encoding': 'gzip'})
+    response.raise_for_status()
+    result = response.json()
+    
+    if result and len(result) > 0 and len(result[0]) > 0:
+        # The response holds one translated segment per input sentence
+        return ''.join(segment[0] for segment in result[0] if segment and segment[0])
+    return text
+
 def translate_text(text, target_language='es'):
     """Translate text using Google Translate (free API)"""
     try:
-        # Simple translation using Google Translate API (free tier)
-        url = "https://translate.googleapis.com/translate_a/single"
-        params = {
-            'client': 'gtx',
-            'sl': 'en',
-            'tl': target_language,
-            'dt': 't',
-            'q': text
-        }
-        
-        response = requests.get(url, params=params)
-        result = response.json()
-        
-        if result and len(result) > 0 and len(result[0]) > 0:
-            return result[0][0][0]
-        return text
+        if len(text) <= TRANSLATE_MAX_CHARS:
+            return _translate_cached(text, target_language)
+        
+        # The endpoint limits request size, so translate long texts sentence by sentence in parallel
+        sentences = [sentence for sentence in re.split(r'(?<=[.!?])\s+', text) if sentence]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+            translated = pool.map(_translate_cached, sentences, [target_language] * len(sentences))
+            return ' '.join(translated)
     except Exception as e:
         print(f"Error translating text: {e}")
         return text
@@ -356,64 +602,191 @@ def text_to_speech(text, language='es'):
             return None
             
         tts = gTTS(text=text, lang=language, slow=False)
-        audio_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-        tts.save(audio_file.name)
-        return audio_file.name
+        audio_file = scratch_path('tts.mp3')
+        tts.save(audio_file)
+        return audio_file
     except Exception as e:
         print(f"Error with text-to-speech: {e}")
         return None
 
+# Whether ffmpeg can decode on the GPU via NVDEC, probed on first use
+_CUDA_HWACCEL = None
+
+def cuda_hwaccel_available():
+    """Return True if ffmpeg lists the cuda hwaccel, probing only once per process"""
+    global _CUDA_HWACCEL
+    if _CUDA_HWACCEL is None:
+        try:
+            result = subprocess.run(["ffmpeg", "-hide_banner", "-hwaccels"],
+                                    capture_output=True, text=True, timeout=10)
+            _CUDA_HWACCEL = 'cuda' in result.stdout.split()
+        except Exception as e:
+            print(f"Could not probe ffmpeg hwaccels: {e}")
+            _CUDA_HWACCEL = False
+    return _CUDA_HWACCEL
+
+def run_ffmpeg_decode(input_args, video_filter, output_args):
+    """Run an ffmpeg frame extraction, decoding on the GPU when possible"""
+    global _CUDA_HWACCEL
+    if cuda_hwaccel_available():
+        hw_filter = "hwdownload,format=nv12,format=bgr24"
+        if video_filter:
+            hw_filter += "," + video_filter
+        try:
+            subprocess.run(
+                ["ffmpeg", "-y", "-hwaccel", "cuda", "-hwaccel_output_format", "cuda",
+                 *input_args, "-vf", hw_filter, *output_args],
+                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            return
+        except subprocess.CalledProcessError:
+            # ffmpeg was built with cuda but there is no usable GPU, stay on the CPU from now on
+            print("CUDA decoding failed, falling back to CPU decoding")
+            _CUDA_HWACCEL = False
+    
+    vf_args = ["-vf", video_filter] if video_filter else []
+    subprocess.run(
+        ["ffmpeg", "-y", *input_args, *vf_args, *output_args],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+def stream_first_frame(url, image_path):
+    """Decode the first frame while the video is still downloading, returning True on success.
+    
+    When ffmpeg cannot decode from the stream the download is finished into the video cache instead."""
+    response = SESSION.get(url, stream=True, timeout=HTTP_TIMEOUT)
+    proc = None
+    partial_path = None
+    try:
+        response.raise_for_status()
+        chunks = iter_video_content(response, 1 << 20)
+        
+        # Read the first chunk before starting ffmpeg so non-MP4 bodies are rejected cheaply
+        first_chunk = next(chunks, b'')
+        if not first_chunk:
+            return False
+        
+        # ffmpeg cannot seek a pipe, so only faststart files (moov before mdat) decode from one
+        if is_faststart(first_chunk):
+            proc = subprocess.Popen(
+                ["ffmpeg", "-y", "-i", "pipe:0", "-frames:v", "1", "-f", "image2", image_path],
+                stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        
+        # Keep the bytes as they pass through so a failed stream never downloads twice
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, partial_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.part')
+        with os.fdopen(fd, 'wb') as f:
+            total = 0
+            for chunk in itertools.chain([first_chunk], chunks):
+                total += len(chunk)
+                if total > VIDEO_MAX_BYTES:
+                    raise IOError(f"Video is larger than {VIDEO_MAX_BYTES // (1024 * 1024)}MB")
+                f.write(chunk)
+                
+                if proc is None:
+                    continue
+                try:
+                    proc.stdin.write(chunk)
+                except OSError:
+                    # ffmpeg stopped reading
+                    pass
+                if proc.poll() is not None:
+                    # ffmpeg has its frame or gave up; without a frame, finish the download
+                    if finish_ffmpeg(proc, image_path):
+                        return True
+                    proc = None
+        
+        if proc is not None and finish_ffmpeg(proc, image_path):
+            return True
+        proc = None
+        
+        if total == 0:
+            raise ValueError("Video file is empty")
+        local_path = video_cache_path(url)
+        os.replace(partial_path, local_path)
+        evict_video_cache(keep=local_path)
+        return False
+    finally:
+        response.close()
+        if proc is not None:
+            proc.kill()
+            proc.wait()
+        if partial_path and os.path.exists(partial_path):
+            os.unlink(partial_path)
+
+def finish_ffmpeg(proc, image_path):
+    """Close ffmpeg's input and return True if it wrote a frame"""
+    try:
+        proc.stdin.close()
+    except OSError:
+        pass
+    return proc.wait() == 0 and os.path.exists(image_path) and os.path.getsize(image_path) > 0
+
 def extract_first_frame(url):
     """Extract first frame from video"""
+    image_file = None
     try:
-        if not CV2_AVAILABLE or not PIL_AVAILABLE:
-            return None
-            
-        # Download video with proper headers and timeout
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, stream=True, headers=headers, timeout=30)
-        response.raise_for_status()
+        if not FFMPEG_AVAILABLE:
+            return extract_first_frame_opencv(url)
         
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+        image_file = scratch_path('frame0.png')
         
-        # Download in chunks
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                temp_file.write(chunk)
-        temp_file.close()
+        # Without a cached copy, pipe the download into ffmpeg so decoding starts right away.
+        # MP4s with moov at the end need the whole (seekable) file, which the stream leaves in the cache.
+        if not os.path.exists(video_cache_path(url)):
+            try:
+                if stream_first_frame(url, image_file):
+                    return image_file
+            except requests.exceptions.RequestException as e:
+                print(f"Could not stream first frame: {e}")
         
-        # Verify file was downloaded completely
-        if os.path.getsize(temp_file.name) == 0:
-            os.unlink(temp_file.name)
+        local_video = get_local_video(url)
+        
+        try:
+            run_ffmpeg_decode(["-ss", "0", "-i", local_video], None,
+                              ["-frames:v", "1", "-f", "image2", image_file])
+        except subprocess.CalledProcessError:
+            if os.path.exists(image_file):
+                os.unlink(image_file)
             return None
         
+        if os.path.getsize(image_file) == 0:
+            os.unlink(image_file)
+            return None
+        return image_file
+    except Exception as e:
+        print(f"Error extracting first frame: {e}")
+        if image_file and os.path.exists(image_file):
+            os.unlink(image_file)
+        return None
+
+def extract_first_frame_opencv(url):
+    """Extract first frame from video with OpenCV (used when ffmpeg is not on PATH)"""
+    try:
+        if not CV2_AVAILABLE:
+            return None
+            
+        local_video = get_local_video(url)
+        
         # Extract first frame
-        cap = cv2.VideoCapture(temp_file.name)
+        cap = cv2.VideoCapture(local_video)
         
         if not cap.isOpened():
             cap.release()
-            os.unlink(temp_file.name)
             return None
         
         ret, frame = cap.read()
         
         if ret and frame is not None:
-            # Convert BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            image = Image.fromarray(frame_rgb)
-            
-            # Save image
-            image_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            image.save(image_file.name)
+            # OpenCV writes the BGR frame directly, low compression keeps encoding fast
+            image_file = scratch_path('frame0.png')
+            cv2.imwrite(image_file, frame, [cv2.IMWRITE_PNG_COMPRESSION, 1])
             
             cap.release()
-            os.unlink(temp_file.name)
-            return image_file.name
+            return image_file
         
         cap.release()
-        os.unlink(temp_file.name)
         return None
     except Exception as e:
         print(f"Error extracting first frame: {e}")
@@ -422,32 +795,35 @@ def extract_first_frame(url):
 def extract_multiple_frames_for_ocr(url, num_frames=5):
     """Extract multiple frames from video for better OCR coverage"""
     try:
-        # Download video with proper headers and timeout
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, stream=True, headers=headers, timeout=30)
-        response.raise_for_status()
+        if not FFMPEG_AVAILABLE:
+            return extract_multiple_frames_opencv(url, num_frames)
         
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+        local_video = get_local_video(url)
         
-        # Download in chunks
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                temp_file.write(chunk)
-        temp_file.close()
+        # Sample frames evenly across the video in a single decoding pass
+        duration = get_cached_video_info(url).get('duration', 0)
+        frame_filter = f"fps={num_frames}/{duration}" if duration > 0 else "fps=1"
+        output_pattern = scratch_path('frame_%02d.jpg')
         
-        # Verify file was downloaded completely
-        if os.path.getsize(temp_file.name) == 0:
-            os.unlink(temp_file.name)
-            return []
+        # JPEG is plenty for OCR and much smaller than PNG
+        run_ffmpeg_decode(["-i", local_video], frame_filter,
+                          ["-frames:v", str(num_frames), "-q:v", "2", output_pattern])
+        
+        return sorted(glob.glob(output_pattern.replace('%02d', '*')))
+    except Exception as e:
+        print(f"Error extracting multiple frames: {e}")
+        return []
+
+def extract_multiple_frames_opencv(url, num_frames=5):
+    """Extract multiple frames from video with OpenCV (used when ffmpeg is not on PATH)"""
+    try:
+        local_video = get_local_video(url)
         
         # Extract multiple frames
-        cap = cv2.VideoCapture(temp_file.name)
+        cap = cv2.VideoCapture(local_video)
         
         if not cap.isOpened():
             cap.release()
-            os.unlink(temp_file.name)
             return []
         
         # Get video properties
@@ -466,49 +842,49 @@ def extract_multiple_frames_for_ocr(url, num_frames=5):
             ret, frame = cap.read()
             
             if ret and frame is not None:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                image = Image.fromarray(frame_rgb)
-                
-                # Save image
-                image_file = tempfile.NamedTemporaryFile(delete=False, suffix=f'_frame_{i}.png')
-                image.save(image_file.name)
-                frame_files.append(image_file.name)
+                # JPEG is plenty for OCR and much smaller than PNG
+                image_file = scratch_path(f'frame_{i:02d}.jpg')
+                cv2.imwrite(image_file, frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+                frame_files.append(image_file)
         
         cap.release()
-        os.unlink(temp_file.name)
         return frame_files
         
     except Exception as e:
         print(f"Error extracting multiple frames: {e}")
         return []
 
+OCR_MAX_DIMENSION = 1600  # Larger frames are downscaled before OCR
+OCR_CONFIG = '--oem 1 --psm 6'  # LSTM engine, treat the image as a single block of text
+NO_TEXT_DETECTED = "No text detected in the image"
+
+# Shared thread pool for OCR; pytesseract waits on the tesseract binary and cv2 releases the GIL,
+# so threads run in parallel without forking the (multi-threaded) server process
+_OCR_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+def preprocess_ocr_image(image_file):
+    """Load an image as a downscaled, binarized grayscale array for Tesseract"""
+    img = cv2.imread(image_file, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise ValueError(f"Could not read image: {image_file}")
+    
+    largest = max(img.shape)
+    if largest > OCR_MAX_DIMENSION:
+        scale = OCR_MAX_DIMENSION / largest
+        img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
+    return cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10)
+
 def perform_ocr(image_file):
     """Perform OCR on image"""
     try:
-        if not PYTESSERACT_AVAILABLE or not PIL_AVAILABLE:
+        if not PYTESSERACT_AVAILABLE or not (CV2_AVAILABLE or PIL_AVAILABLE):
             return "OCR not available on this platform - Tesseract not installed"
             
-        # Try to set tesseract path for different systems
-        import platform
-        system = platform.system()
-        
-        if system == "Windows":
-            possible_paths = [
-                r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-                r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-                r"C:\Users\{}\AppData\Local\Programs\Tesseract-OCR\tesseract.exe".format(os.getenv('USERNAME', '')),
-            ]
-            for path in possible_paths:
-                if os.path.exists(path):
-                    pytesseract.pytesseract.tesseract_cmd = path
-                    break
-        elif system == "Linux":
-            # For deployment platforms like Railway/Heroku
-            try:
-                pytesseract.pytesseract.tesseract_cmd = 'tesseract'
-            except:
-                pass
+        # Windows installs are usually not on PATH; elsewhere the default 'tesseract' is used
+        tesseract_cmd = find_tesseract()
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
         
         # Test if tesseract is actually available
         try:
@@ -516,13 +892,60 @@ def perform_ocr(image_file):
         except Exception as e:
             return f"Tesseract not properly installed: {str(e)}"
         
-        image = Image.open(image_file)
-        text = pytesseract.image_to_string(image)
-        return text.strip() if text.strip() else "No text detected in the image"
+        if CV2_AVAILABLE:
+            image = preprocess_ocr_image(image_file)
+        else:
+            image = Image.open(image_file)
+        text = pytesseract.image_to_string(image, config=OCR_CONFIG)
+        return text.strip() if text.strip() else NO_TEXT_DETECTED
     except Exception as e:
         print(f"Error performing OCR: {e}")
         return f"OCR not available on this platform. Error: {str(e)}"
 
+def perform_ocr_batch(image_files):
+    """Perform OCR on several images in parallel, returning results in input order"""
+    if len(image_files) <= 1:
+        return [perform_ocr(image_file) for image_file in image_files]
+    return list(_OCR_POOL.map(perform_ocr, image_files))
+
+def get_audio_artifact(url, start_time=30, end_time=45):
+    """Return the cached audio segment of a video, extracting it on first use"""
+    return get_artifact(f"{url}:audio_{start_time}_{end_time}", '.wav',
+                        lambda: extract_audio_segment(url, start_time, end_time))
+
+def get_first_frame_artifact(url):
+    """Return the cached first frame of a video, extracting it on first use"""
+    return get_artifact(f"{url}:first_frame", '.png', lambda: extract_first_frame(url))
+
+def get_speech_artifact(text, language='es'):
+    """Return cached speech for a text, generating it on first use"""
+    return get_artifact(f"{language}:{text}:speech", '.mp3', lambda: text_to_speech(text, language))
+
+def translate_segment(url):
+    """Return (transcribed, translated) for the audio segment, or None if no audio could be extracted"""
+    transcribed_text = transcribe_segment(url)
+    if transcribed_text is None:
+        return None
+    return transcribed_text, translate_text(transcribed_text, 'es')
+
+def ocr_video(url):
+    """Return the distinct text found in frames sampled across the video, or None if no frames were extracted"""
+    image_files = extract_multiple_frames_for_ocr(url, 5)
+    if not image_files:
+        return None
+    
+    try:
+        results = perform_ocr_batch(image_files)
+        
+        # Combine the distinct text found across frames
+        unique_results = list(dict.fromkeys(results))
+        detected = [text for text in unique_results if text != NO_TEXT_DETECTED]
+        return "\n\n".join(detected) if detected else unique_results[0]
+    finally:
+        for image_file in image_files:
+            if os.path.exists(image_file):
+                os.unlink(image_file)
+
 @app.route('/')
 def index():
     """Main page"""
@@ -539,9 +962,11 @@ def health():
         "message": "Video Processing App is running",
         "dependencies": {
             "opencv": CV2_AVAILABLE,
+            "ffmpeg": FFMPEG_AVAILABLE,
             "moviepy": MOVIEPY_AVAILABLE,
             "pil": PIL_AVAILABLE,
             "speech_recognition": SPEECH_RECOGNITION_AVAILABLE,
+            "faster_whisper": FASTER_WHISPER_AVAILABLE,
             "gtts": GTTS_AVAILABLE,
             "pytesseract": PYTESSERACT_AVAILABLE
         }
@@ -574,9 +999,9 @@ def play_audio():
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    audio_file = extract_audio_segment(url)
+    audio_file = get_audio_artifact(url)
     if audio_file:
-        return send_file(audio_file, as_attachment=False, mimetype='audio/wav')
+        return send_artifact(audio_file, 'audio/wav')
     else:
         return jsonify({'error': 'Could not extract audio'}), 500
 
@@ -589,10 +1014,10 @@ def download_audio():
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    audio_file = extract_audio_segment(url)
+    audio_file = get_audio_artifact(url)
     if audio_file:
-        return send_file(audio_file, as_attachment=True, 
-                        download_name='audio_segment.wav', mimetype='audio/wav')
+        return send_artifact(audio_file, 'audio/wav', as_attachment=True,
+                             download_name='audio_segment.wav')
     else:
         return jsonify({'error': 'Could not extract audio'}), 500
 
@@ -605,28 +1030,17 @@ def translate_audio():
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    # Extract audio
-    audio_file = extract_audio_segment(url)
-    if not audio_file:
-        return jsonify({'error': 'Could not extract audio'}), 500
-    
     try:
-        # Transcribe
-        transcribed_text = transcribe_audio(audio_file)
-        
-        # Translate
-        translated_text = translate_text(transcribed_text, 'es')
-        
-        # Clean up
-        os.unlink(audio_file)
+        translation = translate_segment(url)
+        if translation is None:
+            return jsonify({'error': 'Could not extract audio'}), 500
         
+        transcribed_text, translated_text = translation
         return jsonify({
             'transcribed': transcribed_text,
             'translated': translated_text
         })
     except Exception as e:
-        if os.path.exists(audio_file):
-            os.unlink(audio_file)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/speak_spanish')
@@ -638,28 +1052,19 @@ def speak_spanish():
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    # Get translated text
-    audio_file = extract_audio_segment(url)
-    if not audio_file:
-        return jsonify({'error': 'Could not extract audio'}), 500
-    
     try:
-        transcribed_text = transcribe_audio(audio_file)
-        translated_text = translate_text(transcribed_text, 'es')
+        translation = translate_segment(url)
+        if translation is None:
+            return jsonify({'error': 'Could not extract audio'}), 500
         
         # Generate speech
-        speech_file = text_to_speech(translated_text, 'es')
-        
-        # Clean up
-        os.unlink(audio_file)
+        speech_file = get_speech_artifact(translation[1], 'es')
         
         if speech_file:
-            return send_file(speech_file, as_attachment=False, mimetype='audio/mpeg')
+            return send_artifact(speech_file, 'audio/mpeg')
         else:
             return jsonify({'error': 'Could not generate speech'}), 500
     except Exception as e:
-        if os.path.exists(audio_file):
-            os.unlink(audio_file)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/first_frame')
@@ -671,9 +1076,9 @@ def first_frame():
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    image_file = extract_first_frame(url)
+    image_file = get_first_frame_artifact(url)
     if image_file:
-        return send_file(image_file, as_attachment=False, mimetype='image/png')
+        return send_artifact(image_file, 'image/png')
     else:
         return jsonify({'error': 'Could not extract first frame'}), 500
 
@@ -686,35 +1091,81 @@ def download_frame():
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    image_file = extract_first_frame(url)
+    image_file = get_first_frame_artifact(url)
     if image_file:
-        return send_file(image_file, as_attachment=True, 
-                        download_name='first_frame.png', mimetype='image/png')
+        return send_artifact(image_file, 'image/png', as_attachment=True,
+                             download_name='first_frame.png')
     else:
         return jsonify({'error': 'Could not extract first frame'}), 500
 
 @app.route('/ocr_text')
 def ocr_text():
-    """Perform OCR on first frame"""
+    """Perform OCR on frames sampled across the video"""
     data = load_data()
     url = data.get('current_video_url')
     
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    image_file = extract_first_frame(url)
-    if not image_file:
-        return jsonify({'error': 'Could not extract first frame'}), 500
-    
     try:
-        ocr_result = perform_ocr(image_file)
-        os.unlink(image_file)
+        ocr_result = ocr_video(url)
+        if ocr_result is None:
+            return jsonify({'error': 'Could not extract frames'}), 500
         return jsonify({'ocr_text': ocr_result})
     except Exception as e:
-        if os.path.exists(image_file):
-            os.unlink(image_file)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/process_all')
+def process_all():
+    """Run frame, OCR and audio processing for the current video concurrently"""
+    data = load_data()
+    url = data.get('current_video_url')
+    
+    if not url:
+        return jsonify({'error': 'No video URL'}), 400
+    
+    try:
+        # Download once up front so every stage reads the cached copy
+        get_local_video(url)
+    except Exception as e:
+        return jsonify({'error': f'Could not download video: {str(e)}'}), 500
+    
+    def audio_stage():
+        translation = translate_segment(url)
+        if translation is None:
+            return None
+        transcribed_text, translated_text = translation
+        return transcribed_text, translated_text, get_speech_artifact(translated_text, 'es')
+    
+    def in_app_context(stage, *args):
+        # Each stage gets its own app context and therefore its own scratch directory
+        with app.app_context():
+            return stage(*args)
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+        futures = {
+            pool.submit(in_app_context, audio_stage): 'audio',
+            pool.submit(in_app_context, get_first_frame_artifact, url): 'frame',
+            pool.submit(in_app_context, ocr_video, url): 'ocr',
+        }
+        stages = {}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                stages[futures[future]] = future.result()
+            except Exception as e:
+                print(f"Error in {futures[future]} stage: {e}")
+                stages[futures[future]] = None
+    
+    audio = stages['audio']
+    return jsonify({
+        'transcribed': audio[0] if audio else None,
+        'translated': audio[1] if audio else None,
+        'ocr': stages['ocr'],
+        'first_frame_url': url_for('first_frame') if stages['frame'] else None,
+        'audio_url': url_for('play_audio') if audio else None,
+        'speech_url': url_for('speak_spanish') if audio and audio[2] else None
+    })
+
 @app.route('/debug_audio')
 def debug_audio():
     """Debug audio extraction and transcription"""
@@ -736,17 +1187,12 @@ def debug_audio():
         # Try transcription
         transcribed_text = transcribe_audio(audio_file)
         
-        # Clean up
-        os.unlink(audio_file)
-        
         return jsonify({
             'audio_file_size': file_size,
             'transcribed_text': transcribed_text,
             'message': 'Audio extraction and transcription completed'
         })
     except Exception as e:
-        if 'audio_file' in locals() and os.path.exists(audio_file):
-            os.unlink(audio_file)
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
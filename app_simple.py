@@ -1,114 +1,360 @@
 from flask import Flask, render_template, request, jsonify, send_file
 import os
 import json
+import functools
+import hashlib
+import sqlite3
 import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+# OpenCV hands URLs to FFmpeg, so only allow the protocols a web video needs
+# (file stays allowed for the local Range-prefix fallback)
+os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS', 'protocol_whitelist;file,http,https,tcp,tls')
 import cv2
 import numpy as np
 import tempfile
 import base64
 from io import BytesIO
-from PIL import Image
 import speech_recognition as sr
 from gtts import gTTS
 import pytesseract
+import threading
 import uuid
+from tesseract_path import find_tesseract
+from mp4_probe import probe_mp4_info
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+    TESSEROCR_AVAILABLE = True
+except ImportError as e:
+    print(f"tesserocr not available, using pytesseract: {e}")
+    TESSEROCR_AVAILABLE = False
+
+# Resolve the Tesseract binary once instead of a PATH lookup per OCR call
+if find_tesseract():
+    pytesseract.pytesseract.tesseract_cmd = find_tesseract()
 
 app = Flask(__name__)
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
-DATA_FILE = 'video_data.json'
+DATA_FILE = 'video_data.json'  # Legacy JSON store, imported into DB_FILE once
+DB_FILE = 'video_cache.db'
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(DB_FILE)), 'cache')
+FIRST_FRAME_BYTES = 1048576 + 1  # MP4s with moov at the front decode a first frame from this much
+TEMP_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None  # RAM-backed on Linux, so temp files skip the disk
+HTTP_TIMEOUT = (5, 30)  # (connect, read) seconds, so a stalled server cannot hold a worker
+# The same limits for FFmpeg when OpenCV opens a URL itself
+CAP_TIMEOUT_PARAMS = [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 5000, cv2.CAP_PROP_READ_TIMEOUT_MSEC, 30000]
+
+# Shared HTTP session so requests reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+_SESSION.mount('http://', _adapter)
+_SESSION.mount('https://', _adapter)
+# Videos don't compress, and raw reads need Content-Length to match the body
+_SESSION.headers['Accept-Encoding'] = 'identity'
 
-def load_data():
-    """Load persistent data from file"""
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    return {"current_video_url": "", "video_info": {}}
+def init_db():
+    """Open the SQLite cache, creating the tables on first run"""
+    db = sqlite3.connect(DB_FILE, check_same_thread=False)
+    # WAL lets readers in other workers proceed while one writes
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')
+    with db:
+        db.execute('CREATE TABLE IF NOT EXISTS cache('
+                   'url TEXT PRIMARY KEY, duration REAL, height INT, ocr TEXT, frame_path TEXT)')
+        db.execute('CREATE TABLE IF NOT EXISTS state(key TEXT PRIMARY KEY, value TEXT)')
+        db.execute('CREATE TABLE IF NOT EXISTS ocr_cache(frame_sha1 TEXT PRIMARY KEY, ocr TEXT)')
+        
+        # Carry over the video stored by the old JSON persistence
+        empty = db.execute('SELECT 1 FROM state LIMIT 1').fetchone() is None
+        if empty and os.path.exists(DATA_FILE):
+            with open(DATA_FILE, 'r') as f:
+                data = json.load(f)
+            url = data.get('current_video_url')
+            info = data.get('video_info', {})
+            if url:
+                db.execute('INSERT OR REPLACE INTO cache(url, duration, height, ocr) VALUES (?, ?, ?, ?)',
+                           (url, info.get('duration'), info.get('height'), info.get('ocr_text')))
+                db.execute("INSERT OR REPLACE INTO state(key, value) VALUES ('current_video_url', ?)", (url,))
+    return db
+
+# One shared connection; sqlite3 connections must not be used by two threads at once
+_DB_LOCK = threading.Lock()
+_DB = init_db()
 
-def save_data(data):
-    """Save data to file"""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f)
+def get_current_url():
+    """Return the URL of the current video, or an empty string"""
+    with _DB_LOCK:
+        row = _DB.execute("SELECT value FROM state WHERE key = 'current_video_url'").fetchone()
+    return row[0] if row else ''
+
+def get_cached_info(url):
+    """Return the stored video info for a URL, or None if it has not been seen"""
+    with _DB_LOCK:
+        row = _DB.execute('SELECT duration, height, ocr FROM cache WHERE url = ?', (url,)).fetchone()
+    if row is None:
+        return None
+    video_info = {"duration": row[0], "height": row[1]}
+    if row[2] is not None:
+        video_info['ocr_text'] = row[2]
+    return video_info
+
+def save_video(url, video_info, frame_path=None):
+    """Store a video's info and make it the current video"""
+    with _DB_LOCK, _DB:
+        # Upsert so an OCR result stored by a background job is kept
+        _DB.execute('INSERT INTO cache(url, duration, height, ocr, frame_path) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT(url) DO UPDATE SET duration = excluded.duration, height = excluded.height, '
+                    'ocr = COALESCE(cache.ocr, excluded.ocr), frame_path = COALESCE(excluded.frame_path, cache.frame_path)',
+                    (url, video_info.get('duration'), video_info.get('height'),
+                     video_info.get('ocr_text'), frame_path))
+        _DB.execute("INSERT OR REPLACE INTO state(key, value) VALUES ('current_video_url', ?)", (url,))
+
+def get_cached_ocr(frame_hash):
+    """Return the OCR text stored for a first frame hash, or None"""
+    with _DB_LOCK:
+        row = _DB.execute('SELECT ocr FROM ocr_cache WHERE frame_sha1 = ?', (frame_hash,)).fetchone()
+    return row[0] if row else None
+
+def save_ocr_text(url, ocr_text, frame_hash):
+    """Store the OCR result for a video and for its first frame"""
+    with _DB_LOCK, _DB:
+        _DB.execute('UPDATE cache SET ocr = ? WHERE url = ?', (ocr_text, url))
+        _DB.execute('INSERT OR REPLACE INTO ocr_cache(frame_sha1, ocr) VALUES (?, ?)', (frame_hash, ocr_text))
+
+# Background work for /submit_url; requests, cv2 and tesseract all release the GIL
+_POOL = ThreadPoolExecutor(max_workers=4)
+_OCR_FUTURES = {}  # url -> OCR still running in _POOL
+
+def fetch_range(url, start, length):
+    """Fetch up to length bytes of a URL from start, or None if Range is not supported"""
+    response = _SESSION.get(url, headers={'Range': f'bytes={start}-{start + length - 1}'},
+                            stream=True, timeout=HTTP_TIMEOUT)
+    try:
+        if response.status_code != 206:
+            return None
+        return bytes(read_into_buffer(response, length))
+    finally:
+        response.close()
 
 def get_video_info(url):
     """Get video duration and height"""
     try:
-        # Download video temporarily
-        response = requests.get(url, stream=True)
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-        
-        for chunk in response.iter_content(chunk_size=8192):
-            temp_file.write(chunk)
-        temp_file.close()
+        # Most MP4s answer from the moov box alone
+        try:
+            video_info = probe_mp4_info(functools.partial(fetch_range, url))
+        except requests.RequestException as e:
+            print(f"Could not probe MP4 metadata: {e}")
+            video_info = None
+        if video_info:
+            return video_info
         
-        # Get video info using OpenCV
-        cap = cv2.VideoCapture(temp_file.name)
+        # FFmpeg streams the URL itself, reading only the container metadata
+        cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG, CAP_TIMEOUT_PARAMS)
         fps = cap.get(cv2.CAP_PROP_FPS)
         frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         duration = frame_count / fps if fps > 0 else 0
         
         cap.release()
-        os.unlink(temp_file.name)
         
         return {"duration": duration, "height": height}
     except Exception as e:
         print(f"Error getting video info: {e}")
         return {"duration": 0, "height": 0}
 
-def extract_first_frame(url):
-    """Extract first frame from video"""
+def read_into_buffer(response, limit):
+    """Read up to limit bytes of a streamed response into one preallocated buffer"""
+    # Decode anyway in case a server compresses the body despite Accept-Encoding: identity;
+    # Content-Length is then the compressed size, so fill up to limit instead
+    response.raw.decode_content = True
+    encoded = response.headers.get('Content-Encoding', 'identity') != 'identity'
+    length = 0 if encoded else int(response.headers.get('Content-Length', 0))
+    length = length or limit
+    buf = bytearray(min(length, limit))
+    mv = memoryview(buf)
+    offset = 0
+    while offset < len(buf):
+        n = response.raw.readinto(mv[offset:])
+        if not n:
+            break
+        offset += n
+    return mv[:offset]
+
+def read_first_frame_from_range(url):
+    """Download only the start of a video and decode its first frame, or None"""
+    response = _SESSION.get(url, headers={'Range': f'bytes=0-{FIRST_FRAME_BYTES - 1}'},
+                            stream=True, timeout=HTTP_TIMEOUT)
     try:
-        # Download video temporarily
-        response = requests.get(url, stream=True)
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-        
-        for chunk in response.iter_content(chunk_size=8192):
-            temp_file.write(chunk)
-        temp_file.close()
+        response.raise_for_status()
+        # Servers that ignore Range send the whole file, so stop after the prefix either way
+        data = read_into_buffer(response, FIRST_FRAME_BYTES)
+    finally:
+        response.close()
+    
+    # OpenCV can only open a path, so write the prefix to a short-lived file and always remove it
+    fd, temp_path = tempfile.mkstemp(suffix='.mp4', dir=TEMP_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
         
-        # Extract first frame
-        cap = cv2.VideoCapture(temp_file.name)
+        cap = cv2.VideoCapture(temp_path)
         ret, frame = cap.read()
+        cap.release()
+        return frame if ret else None
+    finally:
+        os.unlink(temp_path)
+
+def read_first_frame(url):
+    """Decode the first frame of a video as a BGR array, or None"""
+    # Decode straight from the URL; FFmpeg stops fetching after the first frame
+    cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG, CAP_TIMEOUT_PARAMS)
+    ret, frame = cap.read()
+    cap.release()
+    if ret:
+        return frame
+    
+    # OpenCV builds without network support cannot open URLs, fetch the first 1MB instead
+    return read_first_frame_from_range(url)
+
+def extract_first_frame(url):
+    """Extract first frame from video as PNG bytes (lossless, for download and OCR)"""
+    try:
+        frame = read_first_frame(url)
+        if frame is not None:
+            # OpenCV's PNG encoder takes the BGR frame as-is
+            ok, buf = cv2.imencode('.png', frame, [cv2.IMWRITE_PNG_COMPRESSION, 3])
+            if ok:
+                return buf.tobytes()
         
-        if ret:
-            # Convert BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            image = Image.fromarray(frame_rgb)
-            
-            # Save image
-            image_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            image.save(image_file.name)
-            
-            cap.release()
-            os.unlink(temp_file.name)
-            return image_file.name
+        return None
+    except Exception as e:
+        print(f"Error extracting first frame: {e}")
+        return None
+
+def extract_first_frame_jpeg(url):
+    """Extract first frame from video as JPEG bytes (for display in the browser)"""
+    try:
+        # Re-encode the cached PNG when there is one instead of fetching the video again
+        png_path = frame_cache_path(url, '.png')
+        frame = cv2.imread(png_path) if os.path.exists(png_path) else read_first_frame(url)
+        if frame is not None:
+            ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            if ok:
+                return buf.tobytes()
         
-        cap.release()
-        os.unlink(temp_file.name)
         return None
     except Exception as e:
         print(f"Error extracting first frame: {e}")
         return None
 
-def perform_ocr(image_file):
-    """Perform OCR on image"""
+FRAME_EXTRACTORS = {
+    '.png': extract_first_frame,
+    '.jpg': extract_first_frame_jpeg,
+}
+
+def frame_cache_path(url, ext='.png'):
+    """Path of the cached first frame image for a video URL"""
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + ext)
+
+@functools.lru_cache(maxsize=32)
+def _fetch_first_frame(url, ext):
+    """Return the encoded first frame, extracting and persisting it on first use"""
+    path = frame_cache_path(url, ext)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    frame_bytes = FRAME_EXTRACTORS[ext](url)
+    if not frame_bytes:
+        # Raise so failed extractions are not cached
+        raise ValueError("Could not extract first frame")
+    
+    # Write a temp file and move it into place so concurrent readers never see a partial image
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(frame_bytes)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+    return frame_bytes
+
+def get_first_frame(url, ext='.png'):
+    """Return the cached first frame bytes (.png or .jpg), or None if it could not be extracted"""
+    try:
+        return _fetch_first_frame(url, ext)
+    except Exception as e:
+        print(f"Error getting first frame: {e}")
+        return None
+
+OCR_MAX_HEIGHT = 720  # Taller frames are downscaled before OCR
+
+# One Tesseract engine per thread, so the language model loads once instead of per OCR call
+_tess_local = threading.local()
+
+def get_tesseract_api():
+    """Return this thread's persistent Tesseract engine"""
+    if not hasattr(_tess_local, 'api'):
+        _tess_local.api = PyTessBaseAPI(psm=PSM.AUTO)
+    return _tess_local.api
+
+def perform_ocr(image):
+    """Perform OCR on an image array"""
     try:
-        image = Image.open(image_file)
-        text = pytesseract.image_to_string(image)
+        # Tesseract only needs luminance
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        h, w = image.shape
+        if h > OCR_MAX_HEIGHT:
+            image = cv2.resize(image, (w * OCR_MAX_HEIGHT // h, OCR_MAX_HEIGHT), interpolation=cv2.INTER_AREA)
+        # Binarize here so Tesseract can skip its own slower thresholding pass
+        _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        if TESSEROCR_AVAILABLE:
+            api = get_tesseract_api()
+            # Hand over the raw 8-bit pixels; SetImage would re-encode a PIL copy first
+            h, w = image.shape
+            api.SetImageBytes(np.ascontiguousarray(image).tobytes(), w, h, 1, w)
+            text = api.GetUTF8Text()
+        else:
+            text = pytesseract.image_to_string(image)
         return text.strip()
     except Exception as e:
         print(f"Error performing OCR: {e}")
         return "Could not perform OCR"
 
+def ocr_first_frame(url):
+    """OCR the cached first frame and store the result alongside the video info"""
+    frame_bytes = get_first_frame(url)
+    if frame_bytes is None:
+        return "Could not perform OCR"
+    
+    # The same video under another URL (CDN mirror, refreshed signed URL) has the same first frame
+    frame_hash = hashlib.sha1(frame_bytes).hexdigest()
+    ocr_result = get_cached_ocr(frame_hash)
+    if ocr_result is None:
+        # Decode the in-memory PNG straight to grayscale for Tesseract
+        ocr_result = perform_ocr(cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), cv2.IMREAD_GRAYSCALE))
+        if ocr_result == "Could not perform OCR":
+            return ocr_result
+    
+    save_ocr_text(url, ocr_result, frame_hash)
+    return ocr_result
+
 @app.route('/')
 def index():
     """Main page"""
-    data = load_data()
+    current_url = get_current_url()
+    video_info = get_cached_info(current_url) if current_url else None
     return render_template('index.html', 
-                         current_url=data.get('current_video_url', ''),
-                         video_info=data.get('video_info', {}))
+                         current_url=current_url,
+                         video_info=video_info or {})
 
 @app.route('/submit_url', methods=['POST'])
 def submit_url():
@@ -117,44 +363,56 @@ def submit_url():
     if not url:
         return jsonify({'error': 'No URL provided'}), 400
     
-    # Get video info
-    video_info = get_video_info(url)
+    # The URL goes straight to FFmpeg, which would also read local files and other protocols
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ('http', 'https') or not parts.netloc:
+        return jsonify({'error': 'Only http and https video URLs are supported'}), 400
+    
+    # Extract the first frame now so the frame and OCR endpoints never download again
+    frame_fut = _POOL.submit(get_first_frame, url)
+    
+    # Reuse the stored info when a URL is submitted again
+    video_info = get_cached_info(url)
+    if not (video_info and video_info.get('height')):
+        video_info = _POOL.submit(get_video_info, url).result()
+    has_frame = frame_fut.result() is not None
     
     # Save data
-    data = load_data()
-    data['current_video_url'] = url
-    data['video_info'] = video_info
-    save_data(data)
+    save_video(url, video_info, frame_cache_path(url) if has_frame else None)
+    
+    # Prefetch OCR in the background; /ocr_text waits for it if it is still running
+    if has_frame and 'ocr_text' not in video_info and url not in _OCR_FUTURES:
+        ocr_fut = _POOL.submit(ocr_first_frame, url)
+        _OCR_FUTURES[url] = ocr_fut
+        ocr_fut.add_done_callback(lambda fut: _OCR_FUTURES.pop(url, None))
     
     return jsonify({'success': True, 'video_info': video_info})
 
 @app.route('/first_frame')
 def first_frame():
     """Get first frame as image"""
-    data = load_data()
-    url = data.get('current_video_url')
+    url = get_current_url()
     
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    image_file = extract_first_frame(url)
-    if image_file:
-        return send_file(image_file, as_attachment=False, mimetype='image/png')
+    frame_bytes = get_first_frame(url, '.jpg')
+    if frame_bytes:
+        return send_file(BytesIO(frame_bytes), as_attachment=False, mimetype='image/jpeg')
     else:
         return jsonify({'error': 'Could not extract first frame'}), 500
 
 @app.route('/download_frame')
 def download_frame():
     """Download first frame"""
-    data = load_data()
-    url = data.get('current_video_url')
+    url = get_current_url()
     
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    image_file = extract_first_frame(url)
-    if image_file:
-        return send_file(image_file, as_attachment=True, 
+    frame_bytes = get_first_frame(url)
+    if frame_bytes:
+        return send_file(BytesIO(frame_bytes), as_attachment=True, 
                         download_name='first_frame.png', mimetype='image/png')
     else:
         return jsonify({'error': 'Could not extract first frame'}), 500
@@ -162,23 +420,28 @@ def download_frame():
 @app.route('/ocr_text')
 def ocr_text():
     """Perform OCR on first frame"""
-    data = load_data()
-    url = data.get('current_video_url')
+    url = get_current_url()
     
     if not url:
         return jsonify({'error': 'No video URL'}), 400
     
-    image_file = extract_first_frame(url)
-    if not image_file:
-        return jsonify({'error': 'Could not extract first frame'}), 500
+    # OCR results are stored alongside the video info
+    video_info = get_cached_info(url) or {}
+    ocr_result = video_info.get('ocr_text')
+    if ocr_result is not None:
+        return jsonify({'ocr_text': ocr_result})
     
     try:
-        ocr_result = perform_ocr(image_file)
-        os.unlink(image_file)
+        ocr_fut = _OCR_FUTURES.get(url)
+        if ocr_fut is not None:
+            return jsonify({'ocr_text': ocr_fut.result()})
+        
+        if not get_first_frame(url):
+            return jsonify({'error': 'Could not extract first frame'}), 500
+        
+        ocr_result = ocr_first_frame(url)
         return jsonify({'ocr_text': ocr_result})
     except Exception as e:
-        if os.path.exists(image_file):
-            os.unlink(image_file)
         return jsonify({'error': str(e)}), 500
 
 # Placeholder routes for audio features (will show "coming soon" messages)
@@ -199,4 +462,4 @@ def speak_spanish():
     return jsonify({'error': 'Audio features require moviepy - install with: pip install moviepy==1.0.3'}), 501
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=False, host='0.0.0.0', port=5000)
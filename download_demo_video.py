@@ -4,8 +4,37 @@ Download a demo video for testing the application
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import os
 
+# Shared HTTP session so consecutive attempts reuse pooled connections
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+_SESSION.mount('http://', _adapter)
+_SESSION.mount('https://', _adapter)
+# Videos don't compress, and raw reads need Content-Length to match the body
+_SESSION.headers['Accept-Encoding'] = 'identity'
+
+MAX_DOWNLOAD_BYTES = 200 * 1024 * 1024  # The demo only needs a small clip
+
+def check_video_headers(url):
+    """HEAD the URL and return an error message if it is not a video worth downloading, else None"""
+    head = _SESSION.head(url, timeout=5, allow_redirects=True)
+    if head.status_code == 405:
+        # Server does not support HEAD, let the GET decide
+        return None
+    if head.status_code != 200:
+        return f"HTTP {head.status_code}"
+    
+    content_type = head.headers.get('content-type', '').lower()
+    if 'video/' not in content_type and 'application/mp4' not in content_type:
+        return f"Not a video ({content_type or 'no content-type'})"
+    
+    length = int(head.headers.get('content-length', 0))
+    if length > MAX_DOWNLOAD_BYTES:
+        return f"Too large ({length} bytes)"
+    return None
+
 def download_demo_video():
     """Download a sample video for testing"""
     demo_urls = [
@@ -19,14 +48,43 @@ def download_demo_video():
     for i, url in enumerate(demo_urls, 1):
         try:
             print(f"Trying URL {i}: {url}")
-            response = requests.get(url, stream=True, timeout=30)
+            
+            # One round trip to rule out HTML error pages and huge files before downloading
+            problem = check_video_headers(url)
+            if problem:
+                print(f"❌ Skipped: {problem}")
+                continue
+            
+            response = _SESSION.get(url, stream=True, timeout=(5, 30))
             
             if response.status_code == 200:
                 filename = f"demo_video_{i}.mp4"
+                length = int(response.headers.get('Content-Length', 0))
+                if length > MAX_DOWNLOAD_BYTES:
+                    raise IOError("video too large")
+                # Content-Length is only the body size when the server sent it unencoded
+                encoded = response.headers.get('Content-Encoding', 'identity') != 'identity'
                 with open(filename, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
+                    if length and not encoded:
+                        # Read straight into one preallocated buffer instead of a bytes object per chunk
+                        buf = bytearray(length)
+                        mv = memoryview(buf)
+                        offset = 0
+                        while offset < length:
+                            n = response.raw.readinto(mv[offset:])
+                            if not n:
+                                break
+                            offset += n
+                        f.write(mv[:offset])
+                    else:
+                        # No usable Content-Length, so count bytes as they arrive (iter_content decodes)
+                        total = 0
+                        for chunk in response.iter_content(chunk_size=8192):
+                            total += len(chunk)
+                            if total > MAX_DOWNLOAD_BYTES:
+                                raise IOError("video too large")
+                            if chunk:
+                                f.write(chunk)
                 
                 file_size = os.path.getsize(filename)
                 print(f"✅ Downloaded: {filename} ({file_size} bytes)")
@@ -0,0 +1,103 @@
+"""
+Read MP4 duration and frame height from the moov box without downloading the video
+"""
+
+import struct
+
+MP4_PROBE_BYTES = 512 * 1024  # Bytes fetched per Range request when probing MP4 metadata
+MP4_PROBE_REQUESTS = 4  # Box headers to follow before giving up on finding moov
+MP4_MAX_MOOV_BYTES = 16 * 1024 * 1024  # Larger moov boxes are left to OpenCV
+
+def iter_mp4_boxes(data, start=0, end=None):
+    """Yield (box_type, payload_start, box_end) for the MP4 boxes in data[start:end]"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack('>I4s', data[offset:offset + 8])
+        header_size = 8
+        if size == 1:
+            # 64-bit box size follows the type
+            if offset + 16 > end:
+                return
+            size = struct.unpack('>Q', data[offset + 8:offset + 16])[0]
+            header_size = 16
+        if size < header_size:
+            # size 0 (box runs to end of file) or a corrupt header
+            return
+        yield box_type, offset + header_size, offset + size
+        offset += size
+
+def is_faststart(data):
+    """Return True if the moov box comes before mdat in the top-level boxes of data"""
+    for box_type, _, _ in iter_mp4_boxes(data):
+        if box_type == b'moov':
+            return True
+        if box_type == b'mdat':
+            return False
+    return False
+
+def parse_mp4_track_height(data, start, end):
+    """Return the frame height of a trak box, or 0 if it is not a video track"""
+    height = 0
+    handler_type = None
+    for box_type, payload, box_end in iter_mp4_boxes(data, start, end):
+        if box_type == b'tkhd':
+            # Height is a 16.16 fixed point value after the matrix
+            offset = payload + (92 if data[payload] == 1 else 80)
+            height = struct.unpack('>I', data[offset:offset + 4])[0] >> 16
+        elif box_type == b'mdia':
+            for sub_type, sub_payload, _ in iter_mp4_boxes(data, payload, box_end):
+                if sub_type == b'hdlr':
+                    handler_type = data[sub_payload + 8:sub_payload + 12]
+    if handler_type not in (None, b'vide'):
+        return 0
+    return height
+
+def parse_mp4_moov(data):
+    """Parse duration and video height from the contents of a moov box"""
+    duration = 0
+    height = 0
+    for box_type, payload, box_end in iter_mp4_boxes(data):
+        if box_type == b'mvhd':
+            if data[payload] == 1:
+                timescale, units = struct.unpack('>IQ', data[payload + 20:payload + 32])
+            else:
+                timescale, units = struct.unpack('>II', data[payload + 12:payload + 20])
+            duration = units / timescale if timescale else 0
+        elif box_type == b'trak' and not height:
+            height = parse_mp4_track_height(data, payload, box_end)
+    return {"duration": duration, "height": height} if duration and height else None
+
+def probe_mp4_info(fetch):
+    """Read video duration and height from the MP4 moov box, or None.
+
+    fetch(start, length) returns up to length bytes of the file from start, or None if it cannot."""
+    try:
+        offset = 0
+        data = fetch(0, MP4_PROBE_BYTES)
+
+        for _ in range(MP4_PROBE_REQUESTS):
+            if not data:
+                return None
+
+            next_offset = None
+            for box_type, payload, box_end in iter_mp4_boxes(data):
+                if box_type == b'moov':
+                    if box_end <= len(data):
+                        return parse_mp4_moov(data[payload:box_end])
+                    # moov runs past this window, fetch the whole box
+                    if box_end - payload > MP4_MAX_MOOV_BYTES:
+                        return None
+                    moov = fetch(offset + payload, box_end - payload)
+                    return parse_mp4_moov(moov) if moov else None
+                next_offset = offset + box_end
+
+            # moov lives after the last box we saw (usually a large mdat)
+            if next_offset is None or next_offset <= offset:
+                return None
+            offset = next_offset
+            data = fetch(offset, MP4_PROBE_BYTES)
+        return None
+    except (struct.error, IndexError) as e:
+        print(f"Could not parse MP4 metadata: {e}")
+        return None
@@ -0,0 +1,19 @@
+"""
+Locate the Tesseract OCR binary
+"""
+
+import functools
+import os
+import platform
+
+@functools.lru_cache(maxsize=None)
+def find_tesseract():
+    """Return the path of a Windows Tesseract install, or None to use 'tesseract' from PATH"""
+    if platform.system() != "Windows":
+        return None
+    possible_paths = [
+        r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+        r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+        r"C:\Users\{}\AppData\Local\Programs\Tesseract-OCR\tesseract.exe".format(os.getenv('USERNAME', '')),
+    ]
+    return next((path for path in possible_paths if os.path.exists(path)), None)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Check the MP4 moov parser against small synthetic files
+"""
+
+import struct
+
+from mp4_probe import MP4_PROBE_BYTES, is_faststart, probe_mp4_info
+
+def box(box_type, payload=b''):
+    """Build an MP4 box with a 32-bit size"""
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+def large_box(box_type, payload=b''):
+    """Build an MP4 box with a 64-bit size"""
+    return struct.pack('>I4sQ', 1, box_type, 16 + len(payload)) + payload
+
+def mvhd(timescale, units):
+    """Version 0 mvhd with the given timescale and duration"""
+    return box(b'mvhd', bytes(12) + struct.pack('>II', timescale, units) + bytes(80))
+
+def trak(height, handler):
+    """trak with a version 0 tkhd of the given height and an hdlr of the given handler type"""
+    tkhd = box(b'tkhd', bytes(76) + struct.pack('>II', 640 << 16, height << 16))
+    hdlr = box(b'hdlr', bytes(8) + handler + bytes(12))
+    return box(b'trak', tkhd + box(b'mdia', hdlr))
+
+def mp4(moov, mdat_size=1000, faststart=True, large_mdat=False):
+    """Build an MP4 file with the moov box before or after mdat"""
+    ftyp = box(b'ftyp', b'isom' + bytes(4))
+    make_mdat = large_box if large_mdat else box
+    mdat = make_mdat(b'mdat', bytes(mdat_size))
+    return ftyp + (moov + mdat if faststart else mdat + moov)
+
+def fetcher(data, requests):
+    """Serve Range requests from data, recording each one"""
+    def fetch(start, length):
+        requests.append((start, length))
+        return data[start:start + length] or None
+    return fetch
+
+# An audio track first, so the hdlr check has to skip it
+MOOV = box(b'moov', mvhd(1000, 12500) + trak(0, b'soun') + trak(720, b'vide'))
+
+def test_faststart():
+    requests = []
+    info = probe_mp4_info(fetcher(mp4(MOOV), requests))
+    assert info == {"duration": 12.5, "height": 720}
+    assert len(requests) == 1
+
+def test_moov_at_end():
+    requests = []
+    data = mp4(MOOV, mdat_size=2 * MP4_PROBE_BYTES, faststart=False)
+    info = probe_mp4_info(fetcher(data, requests))
+    assert info == {"duration": 12.5, "height": 720}
+    assert len(requests) == 2
+
+def test_moov_after_64_bit_mdat():
+    requests = []
+    data = mp4(MOOV, mdat_size=2 * MP4_PROBE_BYTES, faststart=False, large_mdat=True)
+    assert probe_mp4_info(fetcher(data, requests)) == {"duration": 12.5, "height": 720}
+
+def test_moov_larger_than_probe_window():
+    requests = []
+    padding = box(b'udta', bytes(MP4_PROBE_BYTES))
+    moov = box(b'moov', mvhd(600, 1200) + trak(1080, b'vide') + padding)
+    info = probe_mp4_info(fetcher(mp4(moov), requests))
+    assert info == {"duration": 2.0, "height": 1080}
+    assert len(requests) == 2
+
+def test_audio_only():
+    moov = box(b'moov', mvhd(1000, 5000) + trak(0, b'soun'))
+    assert probe_mp4_info(fetcher(mp4(moov), [])) is None
+
+def test_range_not_supported():
+    data = mp4(MOOV, mdat_size=2 * MP4_PROBE_BYTES, faststart=False)
+    def fetch(start, length):
+        return data[:length] if start == 0 else None
+    assert probe_mp4_info(fetch) is None
+
+def test_truncated_moov():
+    data = mp4(MOOV)
+    assert probe_mp4_info(fetcher(data[:-1000 - 40], [])) is None
+
+def test_is_faststart():
+    assert is_faststart(mp4(MOOV))
+    assert not is_faststart(mp4(MOOV, faststart=False))
+    assert not is_faststart(b'not an mp4')
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -5,7 +5,7 @@ Test script to verify Tesseract OCR installation
 
 import pytesseract
 import platform
-import os
+from tesseract_path import find_tesseract
 
 def test_tesseract():
     """Test Tesseract OCR installation"""
@@ -16,18 +16,11 @@ def test_tesseract():
     try:
         # Try to set tesseract path for Windows
         if platform.system() == "Windows":
-            possible_paths = [
-                r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-                r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-                r"C:\Users\{}\AppData\Local\Programs\Tesseract-OCR\tesseract.exe".format(os.getenv('USERNAME', '')),
-            ]
-            
             print("🔍 Checking common Windows installation paths...")
-            for path in possible_paths:
-                if os.path.exists(path):
-                    print(f"✅ Found Tesseract at: {path}")
-                    pytesseract.pytesseract.tesseract_cmd = path
-                    break
+            path = find_tesseract()
+            if path:
+                print(f"✅ Found Tesseract at: {path}")
+                pytesseract.pytesseract.tesseract_cmd = path
             else:
                 print("❌ Tesseract not found in common paths")
                 print("💡 Please install Tesseract from: https://github.com/UB-Mannheim/tesseract/wiki")
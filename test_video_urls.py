@@ -4,12 +4,19 @@ Test script to validate video URLs
 """
 
 import requests
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 def test_video_url(url):
     """Test if a video URL is accessible and valid"""
-    print(f"🔍 Testing: {url}")
-    
+    # URLs are tested in parallel, so print each report in one go
+    lines = [f"🔍 Testing: {url}"]
+    try:
+        return _check_video_url(url, lines)
+    finally:
+        print("\n".join(lines) + "\n")
+
+def _check_video_url(url, lines):
+    """HEAD the URL and append the findings to lines"""
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -18,24 +25,24 @@ def test_video_url(url):
         # Make a HEAD request first to check if accessible
         response = requests.head(url, headers=headers, timeout=10)
         
-        print(f"   Status: {response.status_code}")
-        print(f"   Content-Type: {response.headers.get('content-type', 'Unknown')}")
-        print(f"   Content-Length: {response.headers.get('content-length', 'Unknown')}")
+        lines.append(f"   Status: {response.status_code}")
+        lines.append(f"   Content-Type: {response.headers.get('content-type', 'Unknown')}")
+        lines.append(f"   Content-Length: {response.headers.get('content-length', 'Unknown')}")
         
         if response.status_code == 200:
             content_type = response.headers.get('content-type', '').lower()
             if 'video' in content_type or 'mp4' in content_type:
-                print("   ✅ Valid video URL")
+                lines.append("   ✅ Valid video URL")
                 return True
             else:
-                print("   ❌ Not a video file")
+                lines.append("   ❌ Not a video file")
                 return False
         else:
-            print(f"   ❌ HTTP Error: {response.status_code}")
+            lines.append(f"   ❌ HTTP Error: {response.status_code}")
             return False
             
     except Exception as e:
-        print(f"   ❌ Error: {e}")
+        lines.append(f"   ❌ Error: {e}")
         return False
 
 def main():
@@ -50,13 +57,10 @@ def main():
     print("🧪 Testing Video URLs...")
     print("=" * 60)
     
-    working_urls = []
-    
-    for url in test_urls:
-        if test_video_url(url):
-            working_urls.append(url)
-        print()
-        time.sleep(1)  # Be nice to servers
+    # Every URL is on a different host, so probe them all at once
+    with ThreadPoolExecutor(max_workers=len(test_urls)) as ex:
+        results = list(ex.map(test_video_url, test_urls))
+    working_urls = [url for url, ok in zip(test_urls, results) if ok]
     
     print("=" * 60)
     print(f"✅ Working URLs: {len(working_urls)}")
@@ -0,0 +1,11 @@
+"""
+WSGI entry point for the simplified app
+
+    gunicorn -w 2 -k gthread --threads 8 --timeout 120 -b 0.0.0.0:5000 wsgi:app
+    waitress-serve --threads=8 --port=5000 wsgi:app   (Windows)
+"""
+
+from app_simple import app
+
+if __name__ == '__main__':
+    app.run()